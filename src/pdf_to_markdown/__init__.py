@@ -2,6 +2,6 @@
 
 __version__ = "0.1.0"
 
-from .converter import PDFToMarkdownConverter
+from .converter import PDFToMarkdownConverter, render_intermediate
 
-__all__ = ["PDFToMarkdownConverter", "__version__"]
+__all__ = ["PDFToMarkdownConverter", "render_intermediate", "__version__"]
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import re
-from typing import Callable
+from typing import Callable, Iterable, Iterator
 
 from .extractor import ContentBlock, PageContent
 
@@ -15,7 +15,7 @@ _FIGURE_RE = re.compile(
 
 
 def build_markdown(
-    pages: list[PageContent],
+    pages: Iterable[PageContent],
     title: str,
     font_stats: dict[str, float],
     *,
@@ -36,14 +36,26 @@ def build_markdown(
         If provided, called with an absolute image path; should return OCR
         text or ``""``.  A ``<details>`` block is emitted for non-empty results.
     """
-    lines: list[str] = []
-    lines.append(f"# {title}\n")
+    return "".join(iter_markdown(pages, title, font_stats, ocr_func=ocr_func))
+
+
+def iter_markdown(
+    pages: Iterable[PageContent],
+    title: str,
+    font_stats: dict[str, float],
+    *,
+    ocr_func: Callable[[str], str] | None = None,
+) -> Iterator[str]:
+    """Like :func:`build_markdown`, but yield the document one page at a time.
+
+    *pages* is consumed lazily, so only one page needs to be in memory.
+    """
+    yield f"# {title}\n\n"
 
     for page in pages:
-        lines.append(f"\n---\n\n## Page {page.page_num}\n")
+        lines: list[str] = [f"\n---\n\n## Page {page.page_num}\n"]
         _emit_page_blocks(page, font_stats, ocr_func, lines)
-
-    return "\n".join(lines) + "\n"
+        yield "".join(f"{line}\n" for line in lines)
 
 
 # ---------------------------------------------------------------------------
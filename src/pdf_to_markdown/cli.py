@@ -7,12 +7,34 @@ import sys
 from pathlib import Path
 
 
+def _positive_int(value: str) -> int:
+    """argparse type: an integer greater than zero."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
+    return number
+
+
 def main(argv: list[str] | None = None) -> None:
     from . import __version__
 
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "serve":
+        _serve_main(argv[1:])
+        return
+    if argv and argv[0] == "render":
+        _render_main(argv[1:])
+        return
+
     parser = argparse.ArgumentParser(
         prog="pdf2markdown",
         description="Convert a PDF document to Markdown with extracted images.",
+        epilog="Run 'pdf2markdown serve --help' for the long-running server mode, "
+               "or 'pdf2markdown render --help' to re-render from an intermediate file.",
     )
     parser.add_argument(
         "-V", "--version",
@@ -49,6 +71,22 @@ def main(argv: list[str] | None = None) -> None:
         default=40,
         help="Ignore images smaller than this in either dimension (px, default: 40).",
     )
+    parser.add_argument(
+        "--memory-budget",
+        type=_positive_int,
+        default=None,
+        metavar="MB",
+        help="Bounded-memory mode for very large PDFs: memory-map the input and "
+             "trim PyMuPDF's caches to stay under this RSS budget (MiB).",
+    )
+    parser.add_argument(
+        "--save-intermediate",
+        action="store_true",
+        default=False,
+        help="Also write the extracted content as JSON Lines next to the "
+             "Markdown file (document.pages.jsonl for document.md), for "
+             "later use with 'pdf2markdown render'.",
+    )
 
     args = parser.parse_args(argv)
 
@@ -61,6 +99,8 @@ def main(argv: list[str] | None = None) -> None:
         ocr=args.ocr,
         markdown_filename=args.md_filename,
         min_image_dim=args.min_image_dim,
+        memory_budget_mb=args.memory_budget,
+        save_intermediate=args.save_intermediate,
     )
 
     try:
@@ -72,5 +112,111 @@ def main(argv: list[str] | None = None) -> None:
     print(f"\nMarkdown written to: {md_path}")
 
 
+def _render_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="pdf2markdown render",
+        description="Rebuild Markdown from an intermediate .pages.jsonl file written "
+                    "with --save-intermediate, without re-parsing the PDF.",
+    )
+    parser.add_argument(
+        "intermediate",
+        type=Path,
+        help="Path to the intermediate .pages.jsonl file.",
+    )
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=None,
+        help="Markdown file to write (default: next to the intermediate file, "
+             "with .md in place of .pages.jsonl). Image links are relative to the images/ "
+             "directory beside the intermediate file.",
+    )
+    parser.add_argument(
+        "--ocr",
+        action="store_true",
+        default=False,
+        help="Run Tesseract OCR on the referenced images.",
+    )
+
+    args = parser.parse_args(argv)
+
+    from .converter import render_intermediate
+
+    try:
+        md_path = render_intermediate(args.intermediate, args.output, ocr=args.ocr)
+    except Exception as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"\nMarkdown written to: {md_path}")
+
+
+def _serve_main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(
+        prog="pdf2markdown serve",
+        description="Serve conversions over HTTP from a warm pool of worker processes.",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Interface to bind (default: 127.0.0.1).",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port to listen on (default: 8765).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=64,
+        help="Jobs allowed to wait for a free worker before requests are "
+             "rejected with HTTP 503 (default: 64).",
+    )
+    parser.add_argument(
+        "--job-timeout",
+        type=float,
+        default=300.0,
+        help="Per-job time limit in seconds, 0 to disable (default: 300). "
+             "A worker that overruns it is killed and replaced.",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=0,
+        help="Per-worker address-space limit in MiB, 0 to disable (default: 0). "
+             "Under this limit, bounded-memory jobs open the PDF without "
+             "memory-mapping it.",
+    )
+    parser.add_argument(
+        "--max-jobs-per-worker",
+        type=int,
+        default=100,
+        help="Restart a worker after this many jobs, 0 to never restart "
+             "(default: 100).",
+    )
+
+    args = parser.parse_args(argv)
+
+    from .server import serve
+
+    serve(
+        args.host,
+        args.port,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        job_timeout=args.job_timeout,
+        memory_limit_mb=args.memory_limit,
+        max_jobs_per_worker=args.max_jobs_per_worker,
+    )
+
+
 if __name__ == "__main__":
     main()
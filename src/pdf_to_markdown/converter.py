@@ -2,16 +2,24 @@
 
 from __future__ import annotations
 
+import tempfile
 import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Optional
+from typing import IO, Callable, ContextManager, Iterator, Optional
 
 import fitz  # PyMuPDF
 
-from .builder import build_markdown
+from .builder import build_markdown, iter_markdown
 from .extractor import PageContent, collect_font_stats, extract_page_content
+from .intermediate import SUFFIX as INTERMEDIATE_SUFFIX, IntermediateReader, IntermediateWriter
+from .memory import current_rss, open_mapped, peak_rss, shrink_store
 from .ocr import is_available as ocr_is_available, ocr_image
 
+# Bounded-memory mode: pages extracted between RSS checks, and its limits
+_INITIAL_BATCH = 8
+_MAX_BATCH = 64
+
 
 class PDFToMarkdownConverter:
     """Convert a PDF file into a Markdown document with extracted images.
@@ -30,6 +38,15 @@ class PDFToMarkdownConverter:
         Name of the generated Markdown file (default ``"document.md"``).
     min_image_dim:
         Ignore images whose width **or** height is below this value (px).
+    memory_budget_mb:
+        If set, run in bounded-memory mode: the PDF is memory-mapped, pages
+        are streamed through a JSON Lines file instead of being held in
+        memory, and MuPDF's store is shrunk between pages to keep the
+        process's private RSS under this many MiB.
+    save_intermediate:
+        If ``True``, also write the extracted content as JSON Lines next to
+        the Markdown file (``document.md`` → ``document.pages.jsonl``) so it
+        can be re-rendered with :func:`render_intermediate`.
     """
 
     def __init__(
@@ -40,21 +57,30 @@ class PDFToMarkdownConverter:
         ocr: bool = False,
         markdown_filename: str = "document.md",
         min_image_dim: int = 40,
+        memory_budget_mb: Optional[int] = None,
+        save_intermediate: bool = False,
     ) -> None:
         self.pdf_path = Path(pdf_path).resolve()
         if not self.pdf_path.is_file():
             raise FileNotFoundError(f"PDF not found: {self.pdf_path}")
 
+        if memory_budget_mb is not None and memory_budget_mb <= 0:
+            raise ValueError(f"memory_budget_mb must be positive, got {memory_budget_mb}")
+
         self.output_dir = Path(output_dir).resolve()
         self.ocr = ocr
         self.markdown_filename = markdown_filename
         self.min_image_dim = min_image_dim
+        self.memory_budget_mb = memory_budget_mb
+        self.save_intermediate = save_intermediate
+        self.peak_private_rss: Optional[int] = None
 
         # Derived paths
         self.doc_name = self.pdf_path.stem  # e.g. "BriefCASE Tutorial"
         self.doc_dir = self.output_dir / self.doc_name
         self.images_dir = self.doc_dir / "images"
         self.md_path = self.doc_dir / self.markdown_filename
+        self.intermediate_path = self.md_path.with_suffix(INTERMEDIATE_SUFFIX)
 
     # ------------------------------------------------------------------
     # Public API
@@ -63,84 +89,264 @@ class PDFToMarkdownConverter:
     def convert(self) -> Path:
         """Run the full conversion pipeline.
 
-        Returns the path to the generated Markdown file.
+        Returns the path to the generated Markdown file.  The peak private
+        RSS of the run (the measure ``memory_budget_mb`` limits, sampled after
+        every page and after rendering) is left in :attr:`peak_private_rss`
+        in bytes, or ``None`` where it cannot be measured.
         """
         t0 = time.perf_counter()
+        self.peak_private_rss = None
 
         self._prepare_dirs()
         print(f"[pdf-to-markdown] Converting: {self.pdf_path.name}")
         print(f"[pdf-to-markdown] Output dir: {self.doc_dir}")
 
+        if self.memory_budget_mb is not None:
+            page_count, img_count = self._convert_bounded()
+        else:
+            page_count, img_count = self._convert_in_memory()
+
+        elapsed = time.perf_counter() - t0
+        if self.peak_private_rss is not None:
+            peak_note = f", peak private RSS {self.peak_private_rss / 2**20:.0f} MiB"
+        else:
+            # No private RSS on this platform: fall back to the process peak
+            peak = peak_rss()
+            peak_note = f", peak RSS {peak / 2**20:.0f} MiB" if peak else ""
+        print(
+            f"[pdf-to-markdown] Done in {elapsed:.1f}s — "
+            f"{page_count} pages, {img_count} images{peak_note} → {self.md_path}"
+        )
+        return self.md_path
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _prepare_dirs(self) -> None:
+        self.doc_dir.mkdir(parents=True, exist_ok=True)
+        self.images_dir.mkdir(parents=True, exist_ok=True)
+
+    def _convert_in_memory(self) -> tuple[int, int]:
+        """Extract every page into memory, then render.
+
+        Returns ``(page_count, image_count)``.
+        """
+        pages: list[PageContent] = []
         doc = fitz.open(str(self.pdf_path))
         try:
-            pages = self._extract_all(doc)
+            with self._open_writer() as writer:
+                for pc in self._iter_pages(doc):
+                    pages.append(pc)
+                    if writer is not None:
+                        writer.write_page(pc)
         finally:
             doc.close()
 
         font_stats = collect_font_stats(pages)
         print(f"[pdf-to-markdown] Body font size: {font_stats['body']:.1f}pt")
 
-        ocr_func = self._make_ocr_func()
         md_text = build_markdown(
             pages,
             title=self.doc_name,
             font_stats=font_stats,
-            ocr_func=ocr_func,
+            ocr_func=_make_ocr_func(self.ocr),
         )
-
         self.md_path.write_text(md_text, encoding="utf-8")
-        elapsed = time.perf_counter() - t0
+        self._sample_rss()
+        return len(pages), _count_images(pages)
 
-        img_count = sum(
-            1 for pg in pages for b in pg.blocks if b.block_type == "image"
-        )
-        print(
-            f"[pdf-to-markdown] Done in {elapsed:.1f}s — "
-            f"{len(pages)} pages, {img_count} images → {self.md_path}"
-        )
-        return self.md_path
+    def _convert_bounded(self) -> tuple[int, int]:
+        """Spill pages to JSON Lines as they are extracted, then render from it.
 
-    # ------------------------------------------------------------------
-    # Internals
-    # ------------------------------------------------------------------
+        Only one page is held in memory at a time: extraction streams into
+        the spill file and rendering streams back out of it.
 
-    def _prepare_dirs(self) -> None:
-        self.doc_dir.mkdir(parents=True, exist_ok=True)
-        self.images_dir.mkdir(parents=True, exist_ok=True)
+        Returns ``(page_count, image_count)``.
+        """
+        img_count = 0
+        with self._open_spill() as spill:
+            with open_mapped(self.pdf_path) as doc, \
+                    IntermediateWriter(spill, title=self.doc_name) as writer:
+                for pc in self._iter_pages(doc):
+                    writer.write_page(pc)
+                    img_count += _count_images([pc])
 
-    def _extract_all(self, doc: fitz.Document) -> list[PageContent]:
-        """Extract content from every page."""
-        pages: list[PageContent] = []
+            page_count = _render_streaming(
+                lambda: self._read_spill(spill), self.md_path, ocr=self.ocr
+            )
+        self._sample_rss()
+        return page_count, img_count
+
+    def _open_spill(self) -> ContextManager[Path | IO[str]]:
+        """Return the bounded-mode spill target.
+
+        That is the intermediate file when one was requested, otherwise an
+        anonymous temporary file that the OS reclaims even if the process is
+        killed.
+        """
+        if self.save_intermediate:
+            return nullcontext(self.intermediate_path)
+        return tempfile.TemporaryFile("w+", encoding="utf-8", dir=self.doc_dir)
+
+    def _read_spill(self, spill: Path | IO[str]) -> IntermediateReader:
+        if isinstance(spill, Path):
+            return IntermediateReader(spill)
+        spill.seek(0)
+        return IntermediateReader(spill, base_dir=self.doc_dir)
+
+    def _open_writer(self) -> ContextManager[Optional[IntermediateWriter]]:
+        """Return a context manager yielding an intermediate writer or *None*."""
+        if not self.save_intermediate:
+            return nullcontext()
+        return IntermediateWriter(self.intermediate_path, title=self.doc_name)
+
+    def _iter_pages(self, doc: fitz.Document) -> Iterator[PageContent]:
+        """Extract and yield every page in order.
+
+        In bounded-memory mode, RSS is checked every few pages and MuPDF's
+        store is trimmed as needed (see :meth:`_rebalance`).
+        """
         total = len(doc)
+        batch = _INITIAL_BATCH
+        since_check = 0
 
         for idx in range(total):
             page = doc.load_page(idx)
             page_num = idx + 1
             print(f"  Extracting page {page_num}/{total} …", end="\r")
-            pc = extract_page_content(doc, page, page_num, self.images_dir)
-            pages.append(pc)
+            yield extract_page_content(doc, page, page_num, self.images_dir)
+
+            rss = self._sample_rss()
+            if self.memory_budget_mb is not None:
+                since_check += 1
+                if since_check >= batch:
+                    since_check = 0
+                    batch = self._rebalance(batch, rss)
 
         print()  # clear the \r line
-        return pages
 
-    def _make_ocr_func(self):
-        """Return an OCR callable or *None*."""
-        if not self.ocr:
-            return None
+    def _sample_rss(self) -> Optional[int]:
+        """Read the current private RSS and fold it into :attr:`peak_private_rss`."""
+        rss = current_rss()
+        if rss is not None and (self.peak_private_rss is None or rss > self.peak_private_rss):
+            self.peak_private_rss = rss
+        return rss
 
-        if not ocr_is_available():
-            print(
-                "[pdf-to-markdown] WARNING: OCR requested but tesseract/pytesseract "
-                "not found — skipping OCR."
-            )
-            return None
+    def _rebalance(self, batch: int, rss: Optional[int]) -> int:
+        """Trim MuPDF's store and adapt the batch size to the memory budget.
+
+        *rss* is the current private RSS, or ``None`` if it cannot be
+        measured.  Returns the number of pages to extract before the next
+        check.
+        """
+        budget = self.memory_budget_mb * 2**20
+
+        if rss is None:
+            # Cannot measure: always trim, check after every page
+            shrink_store(100)
+            return 1
+        if rss > budget:
+            shrink_store(100)
+            return max(1, batch // 2)
+        if rss > budget * 3 // 4:
+            shrink_store(50)
+            return batch
+        if rss < budget // 2:
+            return min(_MAX_BATCH, batch * 2)
+        return batch
+
+
+def render_intermediate(
+    intermediate_path: str | Path,
+    md_path: str | Path | None = None,
+    *,
+    ocr: bool = False,
+) -> Path:
+    """Rebuild Markdown from a JSON Lines intermediate file, without the PDF.
+
+    Pages are streamed from the file rather than loaded at once, so this
+    runs in bounded memory however large the document is.
+
+    *md_path* defaults to the intermediate file's name with ``.md`` in place
+    of ``.pages.jsonl`` (or ``.jsonl``).  Image links are relative, so the
+    Markdown should stay next to ``images/``.
+
+    Returns the path to the generated Markdown file.
+    """
+    t0 = time.perf_counter()
+    intermediate_path = Path(intermediate_path).resolve()
+    if md_path is None:
+        name = intermediate_path.name
+        if name.endswith(INTERMEDIATE_SUFFIX):
+            md_path = intermediate_path.with_name(name[: -len(INTERMEDIATE_SUFFIX)] + ".md")
+        else:
+            md_path = intermediate_path.with_suffix(".md")
+    md_path = Path(md_path).resolve()
+    if md_path == intermediate_path:
+        raise ValueError(f"Markdown output would overwrite its input: {md_path}")
+
+    page_count = _render_streaming(
+        lambda: IntermediateReader(intermediate_path), md_path, ocr=ocr
+    )
+
+    elapsed = time.perf_counter() - t0
+    print(
+        f"[pdf-to-markdown] Rendered {page_count} pages in {elapsed:.2f}s → {md_path}"
+    )
+    return md_path
+
+
+def _render_streaming(
+    open_reader: Callable[[], IntermediateReader],
+    md_path: Path,
+    *,
+    ocr: bool,
+) -> int:
+    """Render Markdown from an intermediate file in two streaming passes.
+
+    The first pass collects font statistics and checks the file is complete;
+    the second streams Markdown into a temporary file that replaces *md_path*
+    only once it is finished.  Returns the number of pages rendered.
+    """
+    with open_reader() as reader:
+        font_stats = collect_font_stats(reader)
+        page_count = reader.page_count or 0
+    print(f"[pdf-to-markdown] Body font size: {font_stats['body']:.1f}pt")
+
+    ocr_func = _make_ocr_func(ocr)
+    tmp_path = md_path.with_name(md_path.name + ".tmp")
+    try:
+        with open_reader() as reader, tmp_path.open("w", encoding="utf-8") as fh:
+            fh.writelines(iter_markdown(reader, reader.title, font_stats, ocr_func=ocr_func))
+        tmp_path.replace(md_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return page_count
+
+
+def _count_images(pages: list[PageContent]) -> int:
+    return sum(1 for pg in pages for b in pg.blocks if b.block_type == "image")
+
+
+def _make_ocr_func(ocr: bool):
+    """Return an OCR callable or *None*."""
+    if not ocr:
+        return None
+
+    if not ocr_is_available():
+        print(
+            "[pdf-to-markdown] WARNING: OCR requested but tesseract/pytesseract "
+            "not found — skipping OCR."
+        )
+        return None
 
-        print("[pdf-to-markdown] Running OCR on extracted images …")
-        _cache: dict[str, str] = {}
+    print("[pdf-to-markdown] Running OCR on extracted images …")
+    _cache: dict[str, str] = {}
 
-        def _cached_ocr(path: str) -> str:
-            if path not in _cache:
-                _cache[path] = ocr_image(path)
-            return _cache[path]
+    def _cached_ocr(path: str) -> str:
+        if path not in _cache:
+            _cache[path] = ocr_image(path)
+        return _cache[path]
 
-        return _cached_ocr
+    return _cached_ocr
@@ -5,6 +5,7 @@ from __future__ import annotations
 import io
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Iterable
 
 import fitz  # PyMuPDF
 from PIL import Image
@@ -79,7 +80,7 @@ def extract_page_content(
     return result
 
 
-def collect_font_stats(pages: list[PageContent]) -> dict[str, float]:
+def collect_font_stats(pages: Iterable[PageContent]) -> dict[str, float]:
     """Determine body-text font size and heading thresholds across all pages.
 
     Returns a dict with keys ``body``, ``h2_min``, ``h3_min``.
@@ -220,6 +221,9 @@ def _extract_images(
             else:
                 _save_image_bytes(image_bytes, ext, abs_path)
 
+            # Drop the raw buffers now rather than on the next iteration
+            del image_bytes, img_data
+
             result.blocks.append(ContentBlock(
                 block_type="image",
                 y_pos=y_pos,
@@ -0,0 +1,207 @@
+"""Versioned JSON Lines intermediate format for extracted page content.
+
+Lets extraction and rendering run separately: a document is extracted once
+to a ``<stem>.pages.jsonl`` file and can then be re-rendered to Markdown
+without touching the PDF.
+
+File layout (one JSON object per line)::
+
+    {"format": "pdf-to-markdown", "version": 1, "title": "My Document"}
+    {"page_num": 1, "width": 612.0, "height": 792.0, "blocks": [...]}
+    {"page_num": 2, ...}
+    {"end": true, "page_count": 2}
+
+The trailer line marks a complete file; readers reject files without it, so
+an extraction that failed part-way can never be rendered as a short
+document.  Blocks store only the :class:`~pdf_to_markdown.extractor.ContentBlock`
+fields that differ from their defaults.  ``image_abs_path`` is not stored;
+it is rebuilt from ``image_rel_path`` relative to the intermediate file,
+which is written next to the Markdown file and its ``images/`` directory.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import fields
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+from .extractor import ContentBlock, PageContent
+
+FORMAT_NAME = "pdf-to-markdown"
+FORMAT_VERSION = 1
+# Suffix replacing the Markdown file's own; the extra ".pages" means the
+# intermediate file can never share the Markdown file's name
+SUFFIX = ".pages.jsonl"
+
+_BLOCK_DEFAULTS = {f.name: f.default for f in fields(ContentBlock)}
+_SKIPPED_FIELDS = {"image_abs_path"}
+
+
+class IntermediateWriter:
+    """Stream :class:`PageContent` objects to a JSON Lines file.
+
+    Use as a context manager and call :meth:`write_page` once per page, in
+    order.  Given a path, output goes to a temporary file next to it, which
+    only replaces *target* once the block exits without an exception.  Given
+    an open text file, pages are written to it directly and it is left open.
+    """
+
+    def __init__(self, target: str | Path | IO[str], *, title: str) -> None:
+        if isinstance(target, (str, Path)):
+            self.path: Optional[Path] = Path(target)
+            self._tmp_path: Optional[Path] = self.path.with_name(self.path.name + ".tmp")
+            self._fh: IO[str] = self._tmp_path.open("w", encoding="utf-8")
+        else:
+            self.path = self._tmp_path = None
+            self._fh = target
+        self._finished = False
+        self._page_count = 0
+        self._write({"format": FORMAT_NAME, "version": FORMAT_VERSION, "title": title})
+
+    def write_page(self, page: PageContent) -> None:
+        self._page_count += 1
+        self._write({
+            "page_num": page.page_num,
+            "width": page.width,
+            "height": page.height,
+            "blocks": [_encode_block(b) for b in page.blocks],
+        })
+
+    def close(self) -> None:
+        """Write the trailer and move the finished file into place."""
+        if self._finished:
+            return
+        self._finished = True
+        self._write({"end": True, "page_count": self._page_count})
+        if self._tmp_path is None:
+            self._fh.flush()
+            return
+        self._fh.close()
+        self._tmp_path.replace(self.path)
+
+    def discard(self) -> None:
+        """Abandon the file, leaving any previous *target* untouched."""
+        if self._finished:
+            return
+        self._finished = True
+        if self._tmp_path is not None:
+            self._fh.close()
+            self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> IntermediateWriter:
+        return self
+
+    def __exit__(self, exc_type: object, *exc: object) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def _write(self, obj: dict[str, Any]) -> None:
+        self._fh.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
+        self._fh.write("\n")
+
+
+class IntermediateReader:
+    """Stream :class:`PageContent` objects back from a JSON Lines file.
+
+    *source* is a path or an open text file positioned at the header (left
+    open by :meth:`close`).  Image paths are resolved against *base_dir*,
+    which defaults to the file's directory.  The header is read on
+    construction (exposing :attr:`title`); iterating the reader yields pages
+    one at a time.  Iteration raises :class:`ValueError` at the end if the
+    file is missing its trailer or the page count does not match.
+    """
+
+    def __init__(
+        self,
+        source: str | Path | IO[str],
+        *,
+        base_dir: str | Path | None = None,
+    ) -> None:
+        if isinstance(source, (str, Path)):
+            self.path = Path(source)
+            self._fh: IO[str] = self.path.open("r", encoding="utf-8")
+            self._owns_fh = True
+        else:
+            name = getattr(source, "name", None)
+            # Anonymous temporary files report their descriptor as the name
+            self.path = Path(name if isinstance(name, str) else "<stream>")
+            self._fh = source
+            self._owns_fh = False
+        self._base_dir = Path(base_dir) if base_dir else self.path.resolve().parent
+
+        try:
+            header = json.loads(self._fh.readline() or "null")
+        except json.JSONDecodeError:
+            header = None
+        if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+            self.close()
+            raise ValueError(f"Not a pdf-to-markdown intermediate file: {self.path}")
+        if header.get("version") != FORMAT_VERSION:
+            self.close()
+            raise ValueError(
+                f"Unsupported intermediate format version {header.get('version')!r} "
+                f"(expected {FORMAT_VERSION}): {self.path}"
+            )
+
+        self.version: int = header["version"]
+        self.title: str = header.get("title", self.path.stem)
+        # Set from the trailer once iteration has reached the end of the file
+        self.page_count: Optional[int] = None
+
+    def __iter__(self) -> Iterator[PageContent]:
+        count = 0
+        for line in self._fh:
+            if not line.strip():
+                continue
+            obj = json.loads(line)
+            if obj.get("end"):
+                if obj.get("page_count") != count:
+                    raise ValueError(
+                        f"Intermediate file has {count} pages but its trailer "
+                        f"records {obj.get('page_count')}: {self.path}"
+                    )
+                self.page_count = count
+                return
+            count += 1
+            yield PageContent(
+                page_num=obj["page_num"],
+                width=obj.get("width", 0.0),
+                height=obj.get("height", 0.0),
+                blocks=[_decode_block(b, self._base_dir) for b in obj.get("blocks", [])],
+            )
+
+        raise ValueError(f"Intermediate file is truncated (no trailer): {self.path}")
+
+    def close(self) -> None:
+        if self._owns_fh:
+            self._fh.close()
+
+    def __enter__(self) -> IntermediateReader:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Internals
+# ---------------------------------------------------------------------------
+
+def _encode_block(blk: ContentBlock) -> dict[str, Any]:
+    """Serialise *blk*, keeping only non-default fields."""
+    return {
+        name: getattr(blk, name)
+        for name, default in _BLOCK_DEFAULTS.items()
+        if name not in _SKIPPED_FIELDS and getattr(blk, name) != default
+    }
+
+
+def _decode_block(obj: dict[str, Any], base_dir: Path) -> ContentBlock:
+    """Rebuild a :class:`ContentBlock`, resolving image paths against *base_dir*."""
+    blk = ContentBlock(**{k: v for k, v in obj.items() if k in _BLOCK_DEFAULTS})
+    if blk.image_rel_path:
+        blk.image_abs_path = str(base_dir / blk.image_rel_path)
+    return blk
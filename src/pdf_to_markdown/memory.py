@@ -0,0 +1,102 @@
+"""Memory helpers for the bounded-memory conversion mode."""
+
+from __future__ import annotations
+
+import errno
+import mmap
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import fitz  # PyMuPDF
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+def current_rss() -> Optional[int]:
+    """Return the private resident set size of this process in bytes.
+
+    File-backed pages (such as a memory-mapped input PDF) are excluded, since
+    the kernel can drop them under pressure.  Returns ``None`` where this
+    cannot be measured (non-Linux platforms).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            fields = fh.read().split()
+        resident, shared = int(fields[1]), int(fields[2])
+    except (OSError, IndexError, ValueError):
+        return None
+    return (resident - shared) * os.sysconf("SC_PAGE_SIZE")
+
+
+def peak_rss() -> Optional[int]:
+    """Return the peak resident set size over the process's lifetime in bytes.
+
+    Unlike :func:`current_rss` this includes file-backed pages.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def address_space_limited() -> bool:
+    """Return True if this process runs under an ``RLIMIT_AS`` limit."""
+    if resource is None:
+        return False
+    soft, _ = resource.getrlimit(resource.RLIMIT_AS)
+    return soft != resource.RLIM_INFINITY
+
+
+def shrink_store(percent: int = 100) -> None:
+    """Release *percent* of MuPDF's resource store (cached fonts, images, …)."""
+    fitz.TOOLS.store_shrink(percent)
+
+
+@contextmanager
+def open_mapped(pdf_path: Path) -> Iterator[fitz.Document]:
+    """Open *pdf_path* through a read-only memory map.
+
+    The document reads straight from the mapping, so its bytes live in the
+    page cache rather than on the heap.  Falls back to a regular
+    ``fitz.open`` on PyMuPDF versions that do not accept a ``memoryview``,
+    and when the process has an address-space limit (``RLIMIT_AS``, as set
+    by ``pdf2markdown serve --memory-limit``): the whole mapping counts
+    against that limit, so a large PDF could not be mapped at all.
+    """
+    mapping = None if address_space_limited() else _map_file(pdf_path)
+    view = memoryview(mapping) if mapping is not None else None
+    try:
+        doc = None
+        if view is not None:
+            try:
+                doc = fitz.open(stream=view, filetype="pdf")
+            except TypeError:
+                pass
+        if doc is None:
+            doc = fitz.open(str(pdf_path))
+        try:
+            yield doc
+        finally:
+            doc.close()
+    finally:
+        if view is not None:
+            view.release()
+            mapping.close()
+
+
+def _map_file(pdf_path: Path) -> Optional[mmap.mmap]:
+    """Map *pdf_path* read-only, or return *None* if there is no room for it."""
+    with open(pdf_path, "rb") as fh:
+        try:
+            return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError as exc:
+            if exc.errno == errno.ENOMEM:
+                return None
+            raise
@@ -3,11 +3,16 @@
 from __future__ import annotations
 
 import shutil
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
 def is_available() -> bool:
-    """Return True if both *pytesseract* and the *tesseract* binary are installed."""
+    """Return True if both *pytesseract* and the *tesseract* binary are installed.
+
+    The result is cached so long-running processes only probe once.
+    """
     if shutil.which("tesseract") is None:
         return False
     try:
@@ -0,0 +1,553 @@
+"""Long-running conversion server backed by a warm worker pool.
+
+Every ``pdf2markdown`` invocation pays for interpreter start-up, the PyMuPDF
+import and the Tesseract probe.  ``pdf2markdown serve`` pays those once: a
+pool of worker processes is started up front (and pre-warmed), and jobs are
+submitted to it over a small local HTTP API.
+
+Endpoints
+---------
+``POST /convert``
+    JSON body with a required ``pdf`` key plus any of ``output_dir``, ``ocr``,
+    ``markdown_filename``, ``min_image_dim``, ``memory_budget_mb`` and
+    ``save_intermediate`` (same meaning as the
+    :class:`~pdf_to_markdown.converter.PDFToMarkdownConverter` arguments).
+    Blocks until the job finishes and returns the Markdown path, the elapsed
+    time and the job's peak private RSS (``peak_private_rss_mb``, the measure
+    ``memory_budget_mb`` limits; ``null`` where it cannot be measured).
+    Answers ``400`` for malformed jobs, ``503`` with ``Retry-After`` when the
+    queue is full, ``504`` when the job exceeds its time limit and ``507``
+    when it runs out of memory.
+``GET /metrics``
+    Throughput, worker occupancy, queue depth and job counters as JSON.
+``GET /health``
+    Liveness check.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import errno
+import io
+import json
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+from collections import deque
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+# Accepted ``POST /convert`` keys and their JSON types
+_JOB_FIELDS: dict[str, type] = {
+    "pdf": str,
+    "output_dir": str,
+    "ocr": bool,
+    "markdown_filename": str,
+    "min_image_dim": int,
+    "memory_budget_mb": int,
+    "save_intermediate": bool,
+}
+
+# Window used for the "recent" throughput figure in /metrics (seconds)
+_THROUGHPUT_WINDOW = 60.0
+
+
+class JobTimeout(Exception):
+    """Raised by the server when a job exceeds its time limit."""
+
+
+class JobFailed(Exception):
+    """Raised by the server when a job fails inside its worker.
+
+    *kind* is ``"not_found"``, ``"out_of_memory"``, ``"crashed"`` (the worker
+    process died) or ``"error"``.
+    """
+
+    def __init__(self, kind: str, message: str) -> None:
+        super().__init__(message)
+        self.kind = kind
+
+
+# ---------------------------------------------------------------------------
+# Worker side (runs in the pool processes)
+# ---------------------------------------------------------------------------
+
+def _init_worker(memory_limit_mb: int) -> None:
+    """Apply resource limits and warm up heavy imports."""
+    # Ctrl-C is handled by the server process, which tears the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    import fitz  # noqa: F401  # PyMuPDF
+    from PIL import Image  # noqa: F401
+
+    from . import converter  # noqa: F401
+    from .ocr import is_available
+
+    is_available()
+
+
+def _worker_main(conn: Any, memory_limit_mb: int) -> None:
+    """Worker loop: run jobs received on *conn* until the pipe closes."""
+    _init_worker(memory_limit_mb)
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send(("ok", _run_job(job)))
+        except Exception as exc:
+            conn.send(("error", (_classify_error(exc), str(exc))))
+
+
+def _run_job(job: dict[str, Any]) -> dict[str, Any]:
+    """Convert one PDF inside a worker process."""
+    from .converter import PDFToMarkdownConverter
+
+    t0 = time.perf_counter()
+    # Progress output is meant for a terminal, not for the server log
+    with contextlib.redirect_stdout(io.StringIO()):
+        converter = PDFToMarkdownConverter(
+            pdf_path=job["pdf"],
+            output_dir=job.get("output_dir", "out"),
+            ocr=job.get("ocr", False),
+            markdown_filename=job.get("markdown_filename", "document.md"),
+            min_image_dim=job.get("min_image_dim", 40),
+            memory_budget_mb=job.get("memory_budget_mb"),
+            save_intermediate=job.get("save_intermediate", False),
+        )
+        md_path = converter.convert()
+
+    peak = converter.peak_private_rss
+    return {
+        "markdown": str(md_path),
+        "elapsed": time.perf_counter() - t0,
+        "peak_private_rss_mb": round(peak / 2**20, 1) if peak is not None else None,
+    }
+
+
+def _classify_error(exc: Exception) -> str:
+    if isinstance(exc, FileNotFoundError):
+        return "not_found"
+    if isinstance(exc, MemoryError):
+        return "out_of_memory"
+    if isinstance(exc, OSError) and exc.errno == errno.ENOMEM:
+        return "out_of_memory"
+    # MuPDF reports allocation failures as "malloc (N bytes) failed"
+    message = str(exc)
+    if "malloc" in message and "failed" in message:
+        return "out_of_memory"
+    return "error"
+
+
+# ---------------------------------------------------------------------------
+# Server side
+# ---------------------------------------------------------------------------
+
+class _Worker:
+    """Handle on one long-lived worker process and its pipe."""
+
+    def __init__(self, ctx: Any, memory_limit_mb: int) -> None:
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_mb),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.jobs_done = 0
+        self.healthy = True
+        self._ready = False
+
+    def run(self, job: dict[str, Any], timeout: Optional[float]) -> dict[str, Any]:
+        """Send *job* to the worker and wait up to *timeout* seconds for it.
+
+        On timeout or a dead worker the worker is marked unhealthy; the
+        caller must then :meth:`stop` it.
+        """
+        if not self._ready:
+            # Warm-up is not counted against the job's time limit
+            self._recv(None)
+            self._ready = True
+
+        try:
+            self.conn.send(job)
+        except (BrokenPipeError, EOFError, OSError):
+            self.healthy = False
+            raise JobFailed("crashed", self._exit_message())
+        self.jobs_done += 1
+
+        status, payload = self._recv(timeout)
+        if status == "ok":
+            return payload
+        raise JobFailed(*payload)
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def _recv(self, timeout: Optional[float]) -> tuple[str, Any]:
+        if not self.conn.poll(timeout):
+            self.healthy = False
+            raise JobTimeout(f"job exceeded {timeout:g}s time limit")
+        try:
+            return self.conn.recv()
+        except EOFError:
+            self.healthy = False
+            raise JobFailed("crashed", self._exit_message())
+
+    def _exit_message(self) -> str:
+        self.process.join(1.0)
+        return f"worker process died (exit code {self.process.exitcode})"
+
+
+class _Metrics:
+    """Thread-safe job counters for the ``/metrics`` endpoint."""
+
+    def __init__(self, workers: int) -> None:
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.started = time.time()
+        self.queued = 0
+        self.busy = 0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.rejected = 0
+        self.worker_restarts = 0
+        self.busy_seconds = 0.0
+        self._recent: deque[float] = deque()
+
+    def job_queued(self) -> None:
+        with self._lock:
+            self.queued += 1
+
+    def job_rejected(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def job_started(self) -> None:
+        with self._lock:
+            self.queued -= 1
+            self.busy += 1
+
+    def job_finished(self, outcome: str, elapsed: float) -> None:
+        now = time.time()
+        with self._lock:
+            self.busy -= 1
+            self.busy_seconds += elapsed
+            if outcome == "completed":
+                self.completed += 1
+                self._recent.append(now)
+            elif outcome == "timed_out":
+                self.timed_out += 1
+            else:
+                self.failed += 1
+
+    def worker_restarted(self) -> None:
+        with self._lock:
+            self.worker_restarts += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            while self._recent and now - self._recent[0] > _THROUGHPUT_WINDOW:
+                self._recent.popleft()
+            uptime = now - self.started
+            finished = self.completed + self.failed + self.timed_out
+            return {
+                "uptime_seconds": round(uptime, 3),
+                "workers": self.workers,
+                "busy_workers": self.busy,
+                "idle_workers": self.workers - self.busy,
+                "queue_depth": self.queued,
+                "in_flight": self.queued + self.busy,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "rejected": self.rejected,
+                "worker_restarts": self.worker_restarts,
+                "throughput_per_second": round(self.completed / uptime, 4) if uptime else 0.0,
+                "recent_throughput_per_second": round(
+                    len(self._recent) / min(uptime, _THROUGHPUT_WINDOW), 4
+                ) if uptime else 0.0,
+                "avg_job_seconds": round(self.busy_seconds / finished, 4) if finished else 0.0,
+            }
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """HTTP server that dispatches conversions to pre-started worker processes.
+
+    Parameters
+    ----------
+    address:
+        ``(host, port)`` to bind.
+    workers:
+        Number of worker processes.
+    max_queue:
+        Jobs allowed to wait for a free worker.  Further requests are
+        rejected with ``503`` until the backlog drains.
+    job_timeout:
+        Per-job wall-clock limit in seconds (``0`` disables it).  A worker
+        that overruns it is killed and replaced.
+    memory_limit_mb:
+        Per-worker address-space limit in MiB (``0`` disables it).
+    max_jobs_per_worker:
+        Recycle a worker after this many jobs (``0`` never recycles).
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        *,
+        workers: int,
+        max_queue: int = 64,
+        job_timeout: float = 300.0,
+        memory_limit_mb: int = 0,
+        max_jobs_per_worker: int = 100,
+    ) -> None:
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.metrics = _Metrics(workers)
+
+        # forkserver keeps PyMuPDF imported in the template process, so
+        # replacement workers start warm without forking the threaded server
+        methods = multiprocessing.get_all_start_methods()
+        self._ctx = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        if "forkserver" in methods:
+            self._ctx.set_forkserver_preload(["fitz", "pdf_to_markdown.converter"])
+
+        # Admission: one slot per worker plus the allowed backlog.  Workers
+        # that time out or die are replaced, so the slots match real capacity.
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._live: set[_Worker] = set()
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        for _ in range(workers):
+            self._idle.put(self._spawn())
+
+        super().__init__(address, _RequestHandler)
+
+    def submit(self, job: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """Run *job* on a free worker and wait for it.
+
+        Returns ``None`` when the queue is full (backpressure).
+        """
+        if not self._slots.acquire(blocking=False):
+            self.metrics.job_rejected()
+            return None
+
+        try:
+            self.metrics.job_queued()
+            worker = self._idle.get()
+            self.metrics.job_started()
+
+            t0 = time.perf_counter()
+            outcome = "failed"
+            try:
+                result = worker.run(job, self.job_timeout or None)
+                outcome = "completed"
+                return result
+            except JobTimeout:
+                outcome = "timed_out"
+                raise
+            finally:
+                self._release(worker)
+                self.metrics.job_finished(outcome, time.perf_counter() - t0)
+        finally:
+            self._slots.release()
+
+    def server_close(self) -> None:
+        super().server_close()
+        with self._lock:
+            workers = list(self._live)
+        for worker in workers:
+            worker.stop()
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self.memory_limit_mb)
+        with self._lock:
+            self._live.add(worker)
+        return worker
+
+    def _release(self, worker: _Worker) -> None:
+        """Return *worker* to the idle queue, replacing it if needed."""
+        worn_out = (
+            self.max_jobs_per_worker
+            and worker.jobs_done >= self.max_jobs_per_worker
+        )
+        if worker.healthy and not worn_out:
+            self._idle.put(worker)
+            return
+
+        with self._lock:
+            self._live.discard(worker)
+        worker.stop()
+        if not worker.healthy:
+            self.metrics.worker_restarted()
+        self._idle.put(self._spawn())
+
+
+def _validate_job(body: Any) -> dict[str, Any]:
+    """Check a ``POST /convert`` body and return the job to submit.
+
+    Raises :class:`ValueError` describing the first problem found.
+    """
+    if not isinstance(body, dict):
+        raise ValueError("request body must be a JSON object")
+    if "pdf" not in body:
+        raise ValueError("missing required key: pdf")
+
+    job: dict[str, Any] = {}
+    for key, expected in _JOB_FIELDS.items():
+        if key not in body or (key == "memory_budget_mb" and body[key] is None):
+            continue
+        value = body[key]
+        # bool is a subclass of int; reject it for numeric fields
+        if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+            raise ValueError(f"{key} must be of type {expected.__name__}")
+        job[key] = value
+
+    if job.get("min_image_dim", 0) < 0:
+        raise ValueError("min_image_dim must not be negative")
+    if job.get("memory_budget_mb", 1) <= 0:
+        raise ValueError("memory_budget_mb must be positive")
+    return job
+
+
+_ERROR_STATUS = {
+    "not_found": HTTPStatus.NOT_FOUND,
+    "out_of_memory": HTTPStatus.INSUFFICIENT_STORAGE,
+}
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: ConversionServer
+    server_version = "pdf2markdown"
+
+    def do_GET(self) -> None:  # noqa: N802
+        if self.path == "/metrics":
+            self._send_json(HTTPStatus.OK, self.server.metrics.snapshot())
+        elif self.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path: {self.path}"})
+
+    def do_POST(self) -> None:  # noqa: N802
+        if self.path != "/convert":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except (ValueError, json.JSONDecodeError) as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"invalid JSON body: {exc}"})
+            return
+
+        try:
+            job = _validate_job(body)
+        except ValueError as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+            return
+
+        try:
+            result = self.server.submit(job)
+        except JobTimeout as exc:
+            self._send_json(HTTPStatus.GATEWAY_TIMEOUT, {"error": str(exc)})
+            return
+        except JobFailed as exc:
+            status = _ERROR_STATUS.get(exc.kind, HTTPStatus.INTERNAL_SERVER_ERROR)
+            self._send_json(status, {"error": str(exc)})
+            return
+
+        if result is None:
+            self._send_json(
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "queue full, retry later"},
+                headers={"Retry-After": "1"},
+            )
+            return
+
+        self._send_json(HTTPStatus.OK, result)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        print(f"[pdf-to-markdown] {self.address_string()} {format % args}")
+
+    def _send_json(
+        self,
+        status: HTTPStatus,
+        payload: dict[str, Any],
+        *,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _raise_interrupt(signum: int, frame: Any) -> None:
+    raise KeyboardInterrupt
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    *,
+    workers: int | None = None,
+    max_queue: int = 64,
+    job_timeout: float = 300.0,
+    memory_limit_mb: int = 0,
+    max_jobs_per_worker: int = 100,
+) -> None:
+    """Start a :class:`ConversionServer` and serve until interrupted."""
+    workers = workers or multiprocessing.cpu_count()
+    server = ConversionServer(
+        (host, port),
+        workers=workers,
+        max_queue=max_queue,
+        job_timeout=job_timeout,
+        memory_limit_mb=memory_limit_mb,
+        max_jobs_per_worker=max_jobs_per_worker,
+    )
+    print(
+        f"[pdf-to-markdown] Serving on http://{host}:{server.server_address[1]} "
+        f"with {workers} workers (queue limit {max_queue})"
+    )
+    # Treat SIGTERM (e.g. from a service manager) like Ctrl-C
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[pdf-to-markdown] Shutting down …")
+    finally:
+        server.server_close()
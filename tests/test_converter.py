@@ -0,0 +1,74 @@
+"""Tests for :class:`pdf_to_markdown.PDFToMarkdownConverter`."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from pdf_to_markdown import PDFToMarkdownConverter, render_intermediate  # noqa: E402
+
+SAMPLE_PDF = Path(__file__).resolve().parents[1] / "BriefCASE Tutorial.pdf"
+
+
+def test_bounded_memory_matches_in_memory_output(tmp_path):
+    plain = PDFToMarkdownConverter(SAMPLE_PDF, tmp_path / "plain").convert()
+    bounded = PDFToMarkdownConverter(
+        SAMPLE_PDF, tmp_path / "bounded", memory_budget_mb=1
+    ).convert()
+
+    assert bounded.read_text(encoding="utf-8") == plain.read_text(encoding="utf-8")
+    # The spill file used to stream pages is removed afterwards
+    assert sorted(p.name for p in bounded.parent.iterdir()) == ["document.md", "images"]
+
+
+def test_bounded_render_failure_keeps_previous_document(tmp_path, monkeypatch):
+    import pdf_to_markdown.converter as converter_mod
+
+    def _failing_iter_markdown(*args, **kwargs):
+        yield "# partial\n"
+        raise RuntimeError("render failed")
+
+    converter = PDFToMarkdownConverter(SAMPLE_PDF, tmp_path, memory_budget_mb=64)
+    converter.doc_dir.mkdir(parents=True)
+    converter.md_path.write_text("previous\n", encoding="utf-8")
+    monkeypatch.setattr(converter_mod, "iter_markdown", _failing_iter_markdown)
+
+    with pytest.raises(RuntimeError, match="render failed"):
+        converter.convert()
+
+    assert converter.md_path.read_text(encoding="utf-8") == "previous\n"
+    assert sorted(p.name for p in converter.doc_dir.iterdir()) == ["document.md", "images"]
+
+
+@pytest.mark.parametrize("budget", [0, -5])
+def test_non_positive_memory_budget_is_rejected(tmp_path, budget):
+    with pytest.raises(ValueError, match="memory_budget_mb"):
+        PDFToMarkdownConverter(SAMPLE_PDF, tmp_path, memory_budget_mb=budget)
+
+
+@pytest.mark.parametrize("md_name", ["document.jsonl", "document.pages.jsonl"])
+def test_intermediate_never_overwrites_markdown(tmp_path, md_name):
+    converter = PDFToMarkdownConverter(
+        SAMPLE_PDF, tmp_path, markdown_filename=md_name, save_intermediate=True
+    )
+    md_path = converter.convert()
+
+    assert converter.intermediate_path != md_path
+    assert md_path.read_text(encoding="utf-8").startswith("# BriefCASE Tutorial")
+    assert converter.intermediate_path.is_file()
+
+
+def test_render_intermediate_matches_converted_markdown(tmp_path):
+    converter = PDFToMarkdownConverter(SAMPLE_PDF, tmp_path, save_intermediate=True)
+    md_path = converter.convert()
+
+    rendered = render_intermediate(
+        converter.intermediate_path, converter.doc_dir / "rendered.md"
+    )
+
+    assert rendered.read_text(encoding="utf-8") == md_path.read_text(encoding="utf-8")
+    with pytest.raises(ValueError, match="overwrite"):
+        render_intermediate(converter.intermediate_path, converter.intermediate_path)
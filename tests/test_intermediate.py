@@ -0,0 +1,64 @@
+"""Tests for the JSON Lines intermediate format."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from pdf_to_markdown.extractor import ContentBlock, PageContent  # noqa: E402
+from pdf_to_markdown.intermediate import IntermediateReader, IntermediateWriter  # noqa: E402
+
+
+def _pages() -> list[PageContent]:
+    return [
+        PageContent(page_num=1, width=612.0, height=792.0, blocks=[
+            ContentBlock("text", 10.5, 72.0, text="Intro", font_size=18.0, is_bold=True),
+            ContentBlock("image", 40.0, 72.0, image_rel_path="images/p001_img01.png",
+                         image_width=300, image_height=200),
+        ]),
+        PageContent(page_num=2, width=612.0, height=792.0, blocks=[
+            ContentBlock("text", 12.0, 72.0, text="Body text", font_size=11.0),
+        ]),
+    ]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "document.jsonl"
+    with IntermediateWriter(path, title="Doc") as writer:
+        for page in _pages():
+            writer.write_page(page)
+
+    with IntermediateReader(path) as reader:
+        assert reader.title == "Doc"
+        pages = list(reader)
+
+    expected = _pages()
+    expected[0].blocks[1].image_abs_path = str(tmp_path / "images/p001_img01.png")
+    assert pages == expected
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = tmp_path / "document.jsonl"
+    with pytest.raises(RuntimeError):
+        with IntermediateWriter(path, title="Doc") as writer:
+            writer.write_page(_pages()[0])
+            raise RuntimeError("extraction failed")
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_truncated_file_is_rejected(tmp_path):
+    path = tmp_path / "document.jsonl"
+    with IntermediateWriter(path, title="Doc") as writer:
+        for page in _pages():
+            writer.write_page(page)
+
+    lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    path.write_text("".join(lines[:-1]), encoding="utf-8")   # drop the trailer
+    with IntermediateReader(path) as reader, pytest.raises(ValueError, match="truncated"):
+        list(reader)
+
+    path.write_text("".join(lines[:2] + lines[-1:]), encoding="utf-8")  # drop a page
+    with IntermediateReader(path) as reader, pytest.raises(ValueError, match="trailer"):
+        list(reader)
@@ -0,0 +1,108 @@
+"""Tests for the ``pdf2markdown serve`` HTTP server."""
+
+from __future__ import annotations
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from pdf_to_markdown.server import ConversionServer, _classify_error  # noqa: E402
+
+SAMPLE_PDF = Path(__file__).resolve().parents[1] / "BriefCASE Tutorial.pdf"
+
+
+@pytest.fixture
+def start_server():
+    servers: list[ConversionServer] = []
+
+    def _start(**kwargs) -> ConversionServer:
+        server = ConversionServer(("127.0.0.1", 0), workers=1, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield _start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _request(server: ConversionServer, path: str, body: dict | None = None):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=60) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+@pytest.mark.parametrize("extra", [{}, {"memory_budget_mb": 64}])
+def test_timeout_returns_504_without_document(start_server, tmp_path, extra):
+    server = start_server(job_timeout=0.5)
+
+    status, payload = _request(
+        server, "/convert", {"pdf": str(SAMPLE_PDF), "output_dir": str(tmp_path), **extra}
+    )
+
+    assert status == 504
+    assert "time limit" in payload["error"]
+    # Only the partially filled images/ directory remains: no Markdown and
+    # no spill or temporary files
+    doc_dir = tmp_path / SAMPLE_PDF.stem
+    assert [p.name for p in doc_dir.iterdir()] == ["images"]
+
+    # The stuck worker was replaced and the pool is back to full capacity
+    _, metrics = _request(server, "/metrics")
+    assert metrics["timed_out"] == 1
+    assert metrics["worker_restarts"] == 1
+    assert metrics["busy_workers"] == 0
+    assert metrics["idle_workers"] == 1
+
+    status, _ = _request(server, "/convert", {"pdf": str(tmp_path / "missing.pdf")})
+    assert status == 404
+
+
+def test_convert_succeeds(start_server, tmp_path):
+    server = start_server()
+
+    status, payload = _request(
+        server, "/convert", {"pdf": str(SAMPLE_PDF), "output_dir": str(tmp_path)}
+    )
+
+    assert status == 200
+    assert Path(payload["markdown"]).is_file()
+    assert payload["peak_private_rss_mb"] is None or payload["peak_private_rss_mb"] > 0
+
+
+@pytest.mark.parametrize("body", [
+    {"pdf": str(SAMPLE_PDF), "memory_budget_mb": "100"},
+    {"pdf": str(SAMPLE_PDF), "min_image_dim": "large"},
+    {"pdf": str(SAMPLE_PDF), "ocr": 1},
+    {"pdf": 42},
+    {"output_dir": "out"},
+])
+def test_invalid_job_returns_400(start_server, body):
+    server = start_server()
+
+    status, payload = _request(server, "/convert", body)
+
+    assert status == 400
+    assert payload["error"]
+
+
+@pytest.mark.parametrize("exc, kind", [
+    (FileNotFoundError("PDF not found: x.pdf"), "not_found"),
+    (MemoryError(), "out_of_memory"),
+    (RuntimeError("code=2: malloc (631125000 bytes) failed"), "out_of_memory"),
+    (ValueError("broken xref"), "error"),
+])
+def test_classify_error(exc, kind):
+    assert _classify_error(exc) == kind